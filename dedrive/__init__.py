@@ -13,8 +13,12 @@ from dedrive.drive import (
     get_user_info,
     fetch_with_retry,
     fetch_all_files,
+    get_start_page_token,
+    apply_changes,
     build_lookups,
     get_path,
+    resolve_paths,
+    build_all_paths,
 )
 from dedrive.dedup import (
     filter_by_path,
@@ -32,6 +36,7 @@ from dedrive.config import (
     get_dupes_folder,
     get_batch_size,
     get_max_preview_size,
+    get_full_rescan_days,
     set_active_profile,
     set_active_profile_from_email,
     create_default_config,
@@ -56,8 +61,12 @@ __all__ = [
     "get_user_info",
     "fetch_with_retry",
     "fetch_all_files",
+    "get_start_page_token",
+    "apply_changes",
     "build_lookups",
     "get_path",
+    "resolve_paths",
+    "build_all_paths",
     # dedup
     "filter_by_path",
     "filter_excluded_paths",
@@ -73,6 +82,7 @@ __all__ = [
     "get_dupes_folder",
     "get_batch_size",
     "get_max_preview_size",
+    "get_full_rescan_days",
     "set_active_profile",
     "set_active_profile_from_email",
     "create_default_config",
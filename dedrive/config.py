@@ -46,6 +46,7 @@ DEFAULTS = {
     "dupes_folder": "/_dupes",
     "batch_size": 100,
     "max_preview_mb": 10,
+    "full_rescan_days": 7,
     "exclude_paths": [],
 }
 
@@ -57,6 +58,7 @@ ENV_VARS = {
     "dupes_folder": "GDRIVE_DUPES_FOLDER",
     "batch_size": "GDRIVE_BATCH_SIZE",
     "max_preview_mb": "GDRIVE_MAX_PREVIEW_MB",
+    "full_rescan_days": "GDRIVE_FULL_RESCAN_DAYS",
     "exclude_paths": "GDRIVE_EXCLUDE_PATHS",
 }
 
@@ -117,7 +119,7 @@ def get_config_value(key: str, cli_value: Any = None) -> Any:
                     return int(env_value)
                 except ValueError:
                     print(f"Warning: Invalid {env_var} value '{env_value}', using default.")
-            elif key == "max_preview_mb":
+            elif key in ("max_preview_mb", "full_rescan_days"):
                 try:
                     return int(env_value)
                 except ValueError:
@@ -195,6 +197,15 @@ def get_max_preview_size() -> int:
     return mb * 1024 * 1024
 
 
+def get_full_rescan_days() -> int:
+    """Get the age in days after which a rescan re-lists the whole drive.
+
+    Rescans within that window only apply the Drive changes feed. 0 forces a
+    full listing on every scan.
+    """
+    return get_config_value("full_rescan_days")
+
+
 def get_exclude_paths(cli_excludes: list[str] = None) -> list[str]:
     """Get exclude paths from CLI, config file, and environment variable.
 
@@ -258,6 +269,7 @@ def create_default_config():
         "# dupes_folder": "/_dupes",
         "# batch_size": 100,
         "# max_preview_mb": 10,
+        "# full_rescan_days": 7,
         "exclude_paths": [
             "# Add paths to exclude from scans, e.g.:",
             "# /Backup/Old",
@@ -281,4 +293,5 @@ def print_config():
     print(f"  dupes_folder: {get_dupes_folder()}")
     print(f"  batch_size: {get_batch_size()}")
     print(f"  max_preview_mb: {get_config_value('max_preview_mb')}")
+    print(f"  full_rescan_days: {get_full_rescan_days()}")
     print(f"  exclude_paths: {get_exclude_paths()}")
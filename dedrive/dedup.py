@@ -3,12 +3,15 @@
 import csv
 import logging
 from collections import defaultdict
+from itertools import combinations
 
-from dedrive.drive import get_path
+from dedrive.drive import get_path, resolve_paths
 
 # Setup logging
 logger = logging.getLogger(__name__)
 
+GOOGLE_APPS_MIME_PREFIX = "application/vnd.google-apps."
+
 
 def filter_by_path(
     files: list[dict], target_path: str, files_by_id: dict[str, dict], path_cache: dict[str, str]
@@ -50,17 +53,18 @@ def filter_excluded_paths(
         if ep:
             normalized_excludes.append(ep)
 
+    # Precompute match keys once: str.startswith accepts a tuple and checks
+    # every prefix in C, so no per-file string building or inner loop
+    exclude_prefixes = tuple(ep + "/" for ep in normalized_excludes)
+    exclude_exact = set(normalized_excludes)
+
     result = []
     excluded_count = 0
     for file in files:
         path = get_path(file["id"], files_by_id, path_cache)
-        excluded = False
-        for exclude in normalized_excludes:
-            if path.startswith(exclude + "/") or path == exclude:
-                excluded = True
-                excluded_count += 1
-                break
-        if not excluded:
+        if path in exclude_exact or path.startswith(exclude_prefixes):
+            excluded_count += 1
+        else:
             result.append(file)
 
     if excluded_count > 0:
@@ -70,28 +74,34 @@ def filter_excluded_paths(
 
 
 def find_duplicates(files: list[dict]) -> tuple[list[dict], int]:
-    """Group files by MD5 and identify duplicates."""
+    """Group files by MD5 and identify duplicates.
+
+    Google Workspace files (including folders) have no MD5 and are counted
+    as skipped.
+    """
     files_by_md5 = defaultdict(list)
     skipped_count = 0
 
     for file in files:
-        mime_type = file.get("mimeType", "")
-        if mime_type.startswith("application/vnd.google-apps."):
+        if file.get("mimeType", "").startswith(GOOGLE_APPS_MIME_PREFIX):
             skipped_count += 1
             continue
-        if mime_type == "application/vnd.google-apps.folder":
-            continue
 
+        # Key on the API's hex string itself: it is already held by the file
+        # dict and caches its hash, so the index adds no per-key allocation
         md5 = file.get("md5Checksum")
         if md5:
             files_by_md5[md5].append(file)
 
-    duplicates = []
-    for md5, file_list in files_by_md5.items():
-        if len(file_list) > 1:
-            sizes = {f.get("size") for f in file_list}
-            uncertain = len(sizes) > 1
-            duplicates.append({"md5": md5, "files": file_list, "uncertain": uncertain})
+    duplicates = [
+        {
+            "md5": md5,
+            "files": file_list,
+            "uncertain": len({f.get("size") for f in file_list}) > 1,
+        }
+        for md5, file_list in files_by_md5.items()
+        if len(file_list) > 1
+    ]
 
     return duplicates, skipped_count
 
@@ -103,31 +113,27 @@ def write_csv(
     path_cache: dict[str, str],
 ):
     """Write duplicates to CSV file."""
-    with open(output_file, "w", newline="", encoding="utf-8") as f:
-        writer = csv.writer(f)
-        writer.writerow(
-            ["filename", "path1", "path2", "date1", "date2", "md5", "size", "status"]
-        )
+    # Resolve every path once up front; rows then read them straight from the cache
+    resolve_paths((f["id"] for dup in duplicates for f in dup["files"]), files_by_id, path_cache)
 
+    def rows():
         for dup in duplicates:
-            file_list = dup["files"]
             md5 = dup["md5"]
             status = "uncertain" if dup["uncertain"] else "duplicate"
-
-            for i, file1 in enumerate(file_list):
-                for file2 in file_list[i + 1 :]:
-                    writer.writerow(
-                        [
-                            file1["name"],
-                            get_path(file1["id"], files_by_id, path_cache),
-                            get_path(file2["id"], files_by_id, path_cache),
-                            file1.get("modifiedTime", ""),
-                            file2.get("modifiedTime", ""),
-                            md5,
-                            file1.get("size", "N/A"),
-                            status,
-                        ]
-                    )
+            # Look each file's fields up once per group, not once per pair
+            entries = [
+                (f["name"], path_cache[f["id"]], f.get("modifiedTime", ""), f.get("size", "N/A"))
+                for f in dup["files"]
+            ]
+            for (name1, path1, date1, size1), (_, path2, date2, _) in combinations(entries, 2):
+                yield (name1, path1, path2, date1, date2, md5, size1, status)
+
+    with open(output_file, "w", newline="", encoding="utf-8", buffering=1 << 20) as f:
+        writer = csv.writer(f)
+        writer.writerow(
+            ["filename", "path1", "path2", "date1", "date2", "md5", "size", "status"]
+        )
+        writer.writerows(rows())
 
 
 def calculate_savings(duplicates: list[dict]) -> int:
@@ -138,19 +144,22 @@ def calculate_savings(duplicates: list[dict]) -> int:
         if dup["uncertain"]:
             continue
 
+        # A group that isn't uncertain has a single size across all copies,
+        # so the savings are every copy but one
         file_list = dup["files"]
-        sizes = [int(f.get("size", 0)) for f in file_list]
-
-        if sizes:
-            total_savings += sum(sizes) - max(sizes)
+        size = int(file_list[0].get("size", 0) or 0)
+        total_savings += size * (len(file_list) - 1)
 
     return total_savings
 
 
+SIZE_UNITS = ("B", "KB", "MB", "GB", "TB", "PB")
+
+
 def format_size(size_bytes: int) -> str:
     """Format bytes as human-readable string."""
-    for unit in ["B", "KB", "MB", "GB", "TB"]:
-        if size_bytes < 1024:
-            return f"{size_bytes:.2f} {unit}"
-        size_bytes /= 1024
-    return f"{size_bytes:.2f} PB"
+    if size_bytes < 1024:
+        return f"{size_bytes:.2f} B"
+    # Each unit is 2**10 larger, so the unit index falls out of the bit length
+    idx = min((int(size_bytes).bit_length() - 1) // 10, len(SIZE_UNITS) - 1)
+    return f"{size_bytes / (1 << (idx * 10)):.2f} {SIZE_UNITS[idx]}"
@@ -2,16 +2,21 @@
 
 import logging
 import os
+import random
 import socket
 import sys
+import threading
 import time
+from concurrent.futures import FIRST_EXCEPTION, ThreadPoolExecutor, wait
 from pathlib import Path
 
 from google.auth.transport.requests import Request
+from google_auth_httplib2 import AuthorizedHttp
 from google.auth.exceptions import RefreshError
 from google.oauth2.credentials import Credentials
 from google_auth_oauthlib.flow import InstalledAppFlow
 from googleapiclient.errors import HttpError
+from googleapiclient.http import build_http
 
 from dedrive.config import get_token_path
 
@@ -22,6 +27,26 @@ SCOPES = [
     "https://www.googleapis.com/auth/drive",  # Full access for move operations
 ]
 
+FOLDER_MIME_TYPE = "application/vnd.google-apps.folder"
+FILE_FIELDS = "id, name, md5Checksum, size, parents, modifiedTime, mimeType"
+OWNED_FILES_QUERY = "trashed = false and 'me' in owners"
+
+# Disjoint MIME-type slices of the owned-files query, paged concurrently
+FETCH_PARTITIONS = {
+    "folders": f"mimeType = '{FOLDER_MIME_TYPE}'",
+    "images": "mimeType contains 'image/'",
+    "videos": "mimeType contains 'video/'",
+    "other": (
+        f"mimeType != '{FOLDER_MIME_TYPE}' "
+        "and not mimeType contains 'image/' and not mimeType contains 'video/'"
+    ),
+}
+
+# Retry policy for Drive API calls
+MAX_RETRIES = 8
+MAX_BACKOFF_SECONDS = 60
+RETRYABLE_STATUSES = (429, 500, 502, 503, 504)
+
 
 def setup_logging(verbose: bool = False, log_file: str = None):
     """Configure logging for the application.
@@ -246,67 +271,113 @@ def authenticate(credentials_path: Path) -> Credentials:
     return creds
 
 
-def fetch_with_retry(service, **kwargs) -> dict:
-    """Fetch with exponential backoff for rate limits."""
-    max_retries = 5
+def fetch_with_retry(service, http=None, **kwargs) -> dict:
+    """Fetch with exponential backoff for rate limits.
+
+    Args:
+        service: Google Drive API service instance.
+        http: Optional per-thread authorized Http to execute the request on,
+            instead of the service's shared (non thread-safe) connection.
+        **kwargs: Arguments for files().list.
+    """
+    return execute_with_retry(lambda: service.files().list(**kwargs), http=http)
+
+
+def execute_with_retry(build_request, http=None) -> dict:
+    """Execute a Drive API request, retrying transient failures.
+
+    Args:
+        build_request: Zero-argument callable returning the request to
+            execute; called again for every attempt.
+        http: Optional authorized Http to execute the request on.
+    """
     last_error = None
 
-    for attempt in range(max_retries):
+    for attempt in range(MAX_RETRIES):
         try:
-            return service.files().list(**kwargs).execute()
+            return build_request().execute(http=http)
         except HttpError as e:
             last_error = e
             if e.resp.status == 401:
                 logger.error("Authentication failed. Your token may have expired.")
                 logger.error("Delete token.json and re-authenticate.")
                 raise
-            elif e.resp.status == 403:
-                if "rate" in str(e).lower():
-                    wait_time = 2**attempt
-                    logger.warning(f"Rate limited, waiting {wait_time}s...")
-                    time.sleep(wait_time)
-                else:
-                    logger.error("Access denied. Check that you have permission to access Google Drive.")
-                    raise
-            elif e.resp.status == 429:
-                wait_time = 2**attempt
-                logger.warning(f"Rate limited, waiting {wait_time}s...")
+            elif _is_retryable_error(e):
+                wait_time = _backoff_delay(attempt, e)
+                logger.warning(
+                    f"Request failed with HTTP {e.resp.status}, retrying in {wait_time:.1f}s..."
+                )
                 time.sleep(wait_time)
+            elif e.resp.status == 403:
+                logger.error(
+                    "Access denied. Check that you have permission to access Google Drive."
+                )
+                raise
             else:
                 raise
 
-    raise HttpError(last_error.resp, last_error.content, "Max retries exceeded due to rate limiting")
+    raise HttpError(last_error.resp, last_error.content, "Max retries exceeded")
 
 
-def fetch_all_files(service) -> list[dict]:
-    """Fetch all owned files from Google Drive, with pagination.
+def _is_retryable_error(e: HttpError) -> bool:
+    """Whether an HttpError is transient: rate limiting or a server error.
 
-    Excludes files shared with the user since they don't count towards
-    the user's storage quota.
+    403 is only retryable for rate-limit reasons; otherwise it means the
+    request is actually forbidden.
+    """
+    if e.resp.status in RETRYABLE_STATUSES:
+        return True
+    return e.resp.status == 403 and "rate" in str(e).lower()
+
+
+def _backoff_delay(attempt: int, error: HttpError = None) -> float:
+    """Seconds to wait before retry number attempt.
+
+    Honors a numeric Retry-After header when the server sends one;
+    otherwise uses full jitter over an exponential cap, so concurrent
+    clients don't retry in lockstep.
+    """
+    if error is not None:
+        retry_after = error.resp.get("retry-after")
+        if retry_after:
+            try:
+                return float(retry_after)
+            except ValueError:
+                pass  # HTTP-date form; fall back to jitter
+    return random.uniform(0, min(MAX_BACKOFF_SECONDS, 2**attempt))
+
+
+def _fetch_query_pages(
+    service, query: str, http=None, label: str = "", cancel: threading.Event = None
+) -> list[dict]:
+    """Page through every result of one files().list query.
+
+    If cancel is given and gets set, stops before the next page and returns
+    what was fetched so far.
     """
     all_files = []
     page_token = None
     page_count = 0
 
-    fields = "nextPageToken, files(id, name, md5Checksum, size, parents, createdTime, modifiedTime, mimeType)"
-    query = "trashed = false and 'me' in owners"
-    logger.info("Fetching owned files only (excluding shared files)")
+    fields = f"nextPageToken, files({FILE_FIELDS})"
 
-    while True:
+    while cancel is None or not cancel.is_set():
         page_count += 1
         response = fetch_with_retry(
             service,
+            http=http,
             q=query,
             pageSize=1000,
             fields=fields,
             pageToken=page_token,
-            includeItemsFromAllDrives=False,
-            supportsAllDrives=False,
+            corpora="user",
         )
 
         files = response.get("files", [])
         all_files.extend(files)
-        logger.info(f"  Page {page_count}: fetched {len(files)} items (total: {len(all_files)})")
+        logger.info(
+            f"  {label}Page {page_count}: fetched {len(files)} items (total: {len(all_files)})"
+        )
 
         page_token = response.get("nextPageToken")
         if not page_token:
@@ -315,33 +386,195 @@ def fetch_all_files(service) -> list[dict]:
     return all_files
 
 
+def fetch_all_files(service, credentials=None) -> list[dict]:
+    """Fetch all owned files from Google Drive, with pagination.
+
+    Excludes files shared with the user since they don't count towards
+    the user's storage quota.
+
+    Pages of a single query must be fetched one after another, so when
+    credentials are given the query is split into disjoint MIME-type
+    partitions (FETCH_PARTITIONS) that are paged concurrently, each on its
+    own authorized connection.
+
+    Args:
+        service: Google Drive API service instance.
+        credentials: Credentials used to open per-thread connections. If
+            omitted, files are fetched with a single sequential query.
+    """
+    logger.info("Fetching owned files only (excluding shared files)")
+
+    if credentials is None:
+        return _fetch_query_pages(service, OWNED_FILES_QUERY)
+
+    cancel = threading.Event()
+    with ThreadPoolExecutor(max_workers=len(FETCH_PARTITIONS)) as executor:
+        futures = [
+            executor.submit(
+                _fetch_query_pages,
+                service,
+                f"{OWNED_FILES_QUERY} and ({partition})",
+                AuthorizedHttp(credentials, http=build_http()),
+                f"[{name}] ",
+                cancel,
+            )
+            for name, partition in FETCH_PARTITIONS.items()
+        ]
+        # If one partition fails, stop the others at their next page instead
+        # of letting them page through the rest of the drive first
+        done, _ = wait(futures, return_when=FIRST_EXCEPTION)
+        if any(future.exception() for future in done):
+            cancel.set()
+        all_files = []
+        for future in futures:
+            all_files.extend(future.result())
+
+    logger.info(f"Fetched {len(all_files)} items from {len(FETCH_PARTITIONS)} partitions")
+    return all_files
+
+
+def get_start_page_token(service) -> str:
+    """Get the Drive changes token marking "now", for a later apply_changes()."""
+    response = execute_with_retry(lambda: service.changes().getStartPageToken())
+    return response["startPageToken"]
+
+
+def apply_changes(service, files_by_id: dict[str, dict], page_token: str) -> tuple[int, str]:
+    """Bring files_by_id up to date using the Drive changes feed.
+
+    Instead of re-listing the whole drive, fetches only the changes since
+    page_token and applies them in place: changed owned files are upserted,
+    while removed, trashed, or no-longer-owned files are dropped.
+
+    Args:
+        service: Google Drive API service instance.
+        files_by_id: File lookup from a previous scan, updated in place.
+        page_token: Token from get_start_page_token() or a previous call.
+
+    Returns:
+        Tuple of (number of changes applied, token for the next call).
+
+    Raises:
+        HttpError: If the token is no longer valid or the API call fails.
+    """
+    fields = (
+        "nextPageToken, newStartPageToken, "
+        f"changes(fileId, removed, file({FILE_FIELDS}, trashed, ownedByMe))"
+    )
+    change_count = 0
+    page_count = 0
+
+    while True:
+        page_count += 1
+        response = execute_with_retry(lambda: service.changes().list(
+            pageToken=page_token,
+            pageSize=1000,
+            spaces="drive",
+            fields=fields,
+        ))
+
+        for change in response.get("changes", []):
+            file_id = change.get("fileId")
+            if not file_id:
+                continue
+            change_count += 1
+            file = change.get("file")
+            gone = change.get("removed") or not file or file.get("trashed")
+            if gone or not file.get("ownedByMe"):
+                files_by_id.pop(file_id, None)
+            else:
+                file.pop("trashed", None)
+                file.pop("ownedByMe", None)
+                files_by_id[file_id] = _intern_file_fields(file)
+
+        logger.info(f"  Changes page {page_count}: {change_count} changes so far")
+
+        if "newStartPageToken" in response:
+            return change_count, response["newStartPageToken"]
+        page_token = response["nextPageToken"]
+
+
+def _intern_file_fields(file: dict) -> dict:
+    """Share repeated string values of a file record across all records.
+
+    Each API response decodes its own copy of every string, so a drive with
+    a million files holds a million copies of a handful of MIME types and
+    folder IDs. Interning collapses them to one object each, which also
+    keeps the pickled scan snapshot small (pickle memoizes shared objects).
+    """
+    mime = file.get("mimeType")
+    if mime is not None:
+        file["mimeType"] = sys.intern(mime)
+    parents = file.get("parents")
+    if parents:
+        file["parents"] = [sys.intern(p) for p in parents]
+    return file
+
+
 def build_lookups(files: list[dict]) -> tuple[dict[str, dict], dict[str, str]]:
     """Build file ID lookup and initialize path cache."""
-    files_by_id = {f["id"]: f for f in files}
+    files_by_id = {f["id"]: _intern_file_fields(f) for f in files}
     path_cache = {}
     return files_by_id, path_cache
 
 
 def get_path(file_id: str, files_by_id: dict[str, dict], path_cache: dict[str, str]) -> str:
-    """Recursively build full path for a file with memoization."""
-    if file_id in path_cache:
-        return path_cache[file_id]
-
-    if file_id not in files_by_id:
-        path_cache[file_id] = ""
-        return ""
-
-    file = files_by_id[file_id]
-    parents = file.get("parents", [])
-
-    if not parents:
-        path = "/" + file["name"]
-    else:
-        parent_path = get_path(parents[0], files_by_id, path_cache)
-        if parent_path:
-            path = parent_path + "/" + file["name"]
-        else:
-            path = "/" + file["name"]
+    """Build full path for a file with memoization.
 
-    path_cache[file_id] = path
+    Walks the parent chain iteratively, so arbitrarily deep folder trees
+    can't hit the interpreter's recursion limit.
+    """
+    path = path_cache.get(file_id)
+    if path is None:
+        resolve_paths((file_id,), files_by_id, path_cache)
+        path = path_cache[file_id]
     return path
+
+
+def resolve_paths(file_ids, files_by_id: dict[str, dict], path_cache: dict[str, str]):
+    """Resolve and memoize paths for many files in a single pass.
+
+    Walks each file's parent chain iteratively up to the first ancestor that
+    is already cached, then fills in the chain top-down. Shared ancestors are
+    therefore resolved once, and afterwards get_path() is a plain dict hit.
+
+    A parent cycle (possible if folders moved while a snapshot was being
+    fetched) is cut where it closes, as if that folder had no parent.
+    """
+    for file_id in file_ids:
+        if file_id in path_cache:
+            continue
+
+        chain = []
+        seen = set()
+        current = file_id
+        while current is not None and current not in path_cache:
+            if current in seen:
+                logger.warning(f"Parent cycle detected at {current}, treating it as a root")
+                current = None
+                break
+            file = files_by_id.get(current)
+            if file is None:
+                path_cache[current] = ""
+                break
+            seen.add(current)
+            chain.append(file)
+            parents = file.get("parents")
+            current = parents[0] if parents else None
+
+        path = path_cache.get(current, "") if current is not None else ""
+        for file in reversed(chain):
+            path = path + "/" + file["name"]
+            path_cache[file["id"]] = path
+
+
+def build_all_paths(files_by_id: dict[str, dict]) -> dict[str, str]:
+    """Compute the full path of every file in one iterative pass.
+
+    Returns a path cache covering all of files_by_id, so callers that need
+    every path (e.g. exclude-path filtering) never fall back to walking
+    parent chains per file.
+    """
+    path_cache = {}
+    resolve_paths(files_by_id.keys(), files_by_id, path_cache)
+    return path_cache
@@ -1,10 +1,15 @@
 """Google Drive Deduplication Manager — Gradio web UI."""
 
-import io
 import json
 import logging
+import os
+import pickle
+import re
 import threading
-from dataclasses import dataclass, field, asdict
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from dataclasses import dataclass, field, fields, asdict
 from datetime import datetime
 from pathlib import Path
 from typing import Optional
@@ -22,8 +27,12 @@ from dedrive import (
     load_existing_token,
     get_user_info,
     fetch_all_files,
+    get_start_page_token,
+    apply_changes,
     build_lookups,
     get_path,
+    resolve_paths,
+    build_all_paths,
     find_duplicates,
     calculate_savings,
     format_size,
@@ -35,6 +44,7 @@ from dedrive import (
     get_dupes_folder,
     get_batch_size,
     get_max_preview_size,
+    get_full_rescan_days,
     set_active_profile_from_email,
 )
 
@@ -47,12 +57,33 @@ def get_output_paths():
         "output_dir": output_dir,
         "preview_cache": output_dir / "preview_cache",
         "decisions_file": output_dir / "decisions.json",
+        "decisions_log_file": output_dir / "decisions.jsonl",
         "scan_results_file": output_dir / "scan_results.json",
+        "scan_snapshot_file": output_dir / "scan_results.pkl",
         "execution_log_file": output_dir / "execution_log.json",
     }
 
 
-@dataclass
+TEXT_PREVIEW_MIME_TYPES = ("application/json", "application/xml", "application/javascript")
+
+# Bump when the pickled scan snapshot layout changes (e.g. new dataclass fields)
+SCAN_SNAPSHOT_VERSION = 4
+
+
+def get_preview_kind(mime_type: str) -> str:
+    """Classify a MIME type as "image", "pdf", "text", "video" or "other"."""
+    if mime_type.startswith("image/"):
+        return "image"
+    if mime_type == "application/pdf":
+        return "pdf"
+    if mime_type.startswith("text/") or mime_type in TEXT_PREVIEW_MIME_TYPES:
+        return "text"
+    if mime_type.startswith("video/"):
+        return "video"
+    return "other"
+
+
+@dataclass(slots=True)
 class FileInfo:
     """File information for display."""
     id: str
@@ -61,17 +92,33 @@ class FileInfo:
     size: int
     modified_time: str
     mime_type: str
+    # Derived once per file rather than on every render; not serialized
+    drive_link: str = field(init=False, repr=False, compare=False)
+    preview_kind: str = field(init=False, repr=False, compare=False)
 
+    def __post_init__(self):
+        self.drive_link = f"https://drive.google.com/file/d/{self.id}/view"
+        self.preview_kind = get_preview_kind(self.mime_type)
 
-@dataclass
+
+# Fields written to scan_results.json (derived fields are recomputed on load)
+FILE_INFO_FIELDS = tuple(f.name for f in fields(FileInfo) if f.init)
+
+
+@dataclass(slots=True)
 class DuplicateGroup:
     """A group of duplicate files sharing the same MD5."""
     md5: str
     files: list[FileInfo]
     uncertain: bool
+    # This group's files by ID (not the drive-wide state.files_by_id)
+    file_index: dict[str, FileInfo] = field(init=False, repr=False, compare=False)
 
+    def __post_init__(self):
+        self.file_index = {f.id: f for f in self.files}
 
-@dataclass
+
+@dataclass(slots=True)
 class Decision:
     """A decision made for a duplicate group."""
     md5: str
@@ -86,6 +133,7 @@ class AppState:
     """Application state."""
     # Google Drive service
     service: object = None
+    credentials: object = None
 
     # User info
     user_email: str = ""
@@ -98,11 +146,20 @@ class AppState:
     _oauth_result: object = None
     _oauth_error: str = ""
 
+    # Background preview prefetch
+    _prefetch_executor: object = None
+    _prefetch_futures: dict = field(default_factory=dict)  # cache key -> Future
+
     # Scan data
-    all_files: list[dict] = field(default_factory=list)
     files_by_id: dict = field(default_factory=dict)
+    start_page_token: Optional[str] = None  # Drive changes token as of files_by_id
+    full_scan_at: Optional[str] = None  # UTC ISO time files_by_id was last fully listed
     path_cache: dict = field(default_factory=dict)
     duplicate_groups: list[DuplicateGroup] = field(default_factory=list)
+    # file_id -> FileInfo, for files in any duplicate group
+    file_infos: dict[str, FileInfo] = field(default_factory=dict)
+    # cache key -> (type, content), least recently used first
+    preview_memo: OrderedDict[str, tuple] = field(default_factory=OrderedDict)
 
     # Navigation
     current_index: int = 0
@@ -111,11 +168,24 @@ class AppState:
 
     # Decisions
     decisions: dict[str, Decision] = field(default_factory=dict)
+    decisions_serialized: dict[str, dict] = field(default_factory=dict)  # md5 -> asdict(decision)
+    decisions_loaded: bool = False
+    decisions_intact: bool = False  # both decision files read cleanly, safe to compact
 
 
 # Global state
 state = AppState()
 
+# How many upcoming groups to prefetch previews for, and the cap on downloads in flight
+PREFETCH_GROUPS = 3
+PREFETCH_MAX_IN_FLIGHT = 8
+
+# Rendered previews kept in memory; older ones are re-rendered from the disk cache
+PREVIEW_MEMO_SIZE = 256
+
+# Per-thread Drive services for prefetch workers (httplib2 isn't thread-safe)
+_thread_local = threading.local()
+
 
 def ensure_dirs():
     """Ensure output directories exist."""
@@ -124,44 +194,140 @@ def ensure_dirs():
     paths["preview_cache"].mkdir(parents=True, exist_ok=True)
 
 
-def load_decisions() -> dict[str, Decision]:
-    """Load decisions from JSON file."""
-    decisions_file = get_output_paths()["decisions_file"]
-
-    if not decisions_file.exists():
-        return {}
+@contextmanager
+def atomic_write(path: Path, mode: str = "w", **kwargs):
+    """Open a partial file for writing and move it over path on success.
 
+    Readers (and the next launch, after a crash mid-save) only ever see the
+    previous complete file or the new one, never a truncated one.
+    """
+    part_path = path.with_name(path.name + ".part")
     try:
-        with open(decisions_file) as f:
-            data = json.load(f)
-
-        decisions = {}
-        for md5, d in data.get("decisions", {}).items():
-            decisions[md5] = Decision(
-                md5=d["md5"],
-                action=d["action"],
-                keep_file_id=d.get("keep_file_id"),
-                delete_file_ids=d.get("delete_file_ids", []),
-                decided_at=d.get("decided_at", ""),
-            )
-        return decisions
-    except json.JSONDecodeError as e:
-        print(f"Error: Invalid JSON in decisions file: {e}")
-        return {}
-    except Exception as e:
-        print(f"Error loading decisions: {e}")
-        return {}
+        with open(part_path, mode, **kwargs) as f:
+            yield f
+        os.replace(part_path, path)
+    except BaseException:
+        part_path.unlink(missing_ok=True)
+        raise
+
+
+def _decision_from_dict(d: dict) -> Decision:
+    """Build a Decision from its serialized dict."""
+    return Decision(
+        md5=d["md5"],
+        action=d["action"],
+        keep_file_id=d.get("keep_file_id"),
+        delete_file_ids=d.get("delete_file_ids", []),
+        decided_at=d.get("decided_at", ""),
+    )
+
+
+def load_decisions() -> tuple[dict[str, Decision], bool]:
+    """Load decisions from decisions.json, then replay the append-only log.
+
+    Entries in decisions.jsonl are newer than the JSON snapshot, so they
+    overwrite it; the latest entry per MD5 wins. The log is replayed even if
+    the snapshot can't be read.
+
+    Returns:
+        Tuple of (decisions, intact). intact is False if either file failed
+        to load, in which case the files must not be compacted.
+    """
+    paths = get_output_paths()
+    decisions_file = paths["decisions_file"]
+    decisions_log_file = paths["decisions_log_file"]
+
+    decisions = {}
+    intact = True
+
+    if decisions_file.exists():
+        try:
+            with open(decisions_file) as f:
+                data = json.load(f)
+
+            for md5, d in data.get("decisions", {}).items():
+                decisions[md5] = _decision_from_dict(d)
+        except json.JSONDecodeError as e:
+            print(f"Error: Invalid JSON in decisions file: {e}")
+            decisions = {}
+            intact = False
+        except Exception as e:
+            print(f"Error loading decisions: {e}")
+            decisions = {}
+            intact = False
+
+    if decisions_log_file.exists():
+        try:
+            with open(decisions_log_file) as f:
+                for line_number, line in enumerate(f, 1):
+                    if not line.strip():
+                        continue
+                    try:
+                        d = json.loads(line)
+                    except json.JSONDecodeError:
+                        # A crash mid-append can leave a truncated last line
+                        print(f"Warning: Skipping invalid line {line_number} in decisions log")
+                        continue
+                    decisions[d["md5"]] = _decision_from_dict(d)
+        except Exception as e:
+            print(f"Error loading decisions log: {e}")
+            intact = False
+
+    return decisions, intact
+
+
+def append_decision(decision_dict: dict):
+    """Append a single serialized decision to the decisions log.
+
+    O(1) per decision, unlike rewriting decisions.json on every click.
+    """
+    ensure_dirs()
+    decisions_log_file = get_output_paths()["decisions_log_file"]
+    with open(decisions_log_file, "a") as f:
+        f.write(json.dumps(decision_dict) + "\n")
+
+
+def compact_decisions():
+    """Fold the decisions log into decisions.json and remove the log.
 
+    Skipped when the last load_decisions() hit an error: rewriting
+    decisions.json and deleting the log would drop whatever wasn't read.
+    """
+    decisions_log_file = get_output_paths()["decisions_log_file"]
+    if not decisions_log_file.exists():
+        return
+    if not state.decisions_intact:
+        print("Warning: Not compacting decisions log because decisions failed to load cleanly")
+        return
+    save_decisions()
+    decisions_log_file.unlink()
+
+
+def set_decisions(decisions: dict[str, Decision]):
+    """Replace the in-memory decisions and rebuild their serialized form."""
+    state.decisions = decisions
+    state.decisions_serialized = {md5: asdict(d) for md5, d in decisions.items()}
 
-def save_decisions(decisions: dict[str, Decision], scan_info: dict = None):
-    """Save decisions to JSON file."""
+
+def save_decisions(scan_info: dict = None):
+    """Save state.decisions to JSON file.
+
+    Reuses the per-decision dicts kept in state.decisions_serialized, so only
+    decisions changed since the last save pay for asdict().
+    """
     ensure_dirs()
     decisions_file = get_output_paths()["decisions_file"]
+    decisions = state.decisions
 
-    # Calculate statistics
-    decided = sum(1 for d in decisions.values() if d.action != "skip")
-    skipped = sum(1 for d in decisions.values() if d.action == "skip")
-    files_to_delete = sum(len(d.delete_file_ids) for d in decisions.values() if d.action != "skip")
+    # Calculate statistics in a single pass over the decisions
+    skipped = 0
+    files_to_delete = 0
+    for d in decisions.values():
+        if d.action == "skip":
+            skipped += 1
+        else:
+            files_to_delete += len(d.delete_file_ids)
+    decided = len(decisions) - skipped
 
     data = {
         "version": "1.0",
@@ -173,66 +339,136 @@ def save_decisions(decisions: dict[str, Decision], scan_info: dict = None):
             "pending": len(state.duplicate_groups) - len(decisions),
             "files_to_delete": files_to_delete,
         },
-        "decisions": {md5: asdict(d) for md5, d in decisions.items()},
+        "decisions": state.decisions_serialized,
     }
 
-    with open(decisions_file, "w") as f:
-        json.dump(data, f, indent=2)
+    # Encode in one go and issue a single write instead of one per token
+    with atomic_write(decisions_file) as f:
+        f.write(json.dumps(data, indent=2))
+
 
+def save_scan_results(
+    duplicate_groups: list[DuplicateGroup],
+    files_by_id: dict[str, dict],
+    scan_path: str = None,
+    start_page_token: str = None,
+    full_scan_at: str = None,
+):
+    """Save scan results to JSON file for reuse across sessions.
 
-def save_scan_results(duplicate_groups: list[DuplicateGroup], all_files: list[dict], scan_path: str = None):
-    """Save scan results to JSON file for reuse across sessions."""
+    A pickle snapshot of the same data is written next to it so the next
+    launch can skip JSON parsing entirely. The path cache isn't stored: the
+    duplicate groups already carry their paths, and any other path is
+    resolved lazily from files_by_id.
+    """
     ensure_dirs()
-    scan_results_file = get_output_paths()["scan_results_file"]
+    paths = get_output_paths()
+    scan_results_file = paths["scan_results_file"]
+    scan_snapshot_file = paths["scan_snapshot_file"]
 
     data = {
         "version": "1.0",
         "scanned_at": datetime.utcnow().isoformat() + "Z",
         "scan_path": scan_path,
-        "total_files": len(all_files),
+        "total_files": len(files_by_id),
         "duplicate_groups": [
             {
                 "md5": g.md5,
                 "uncertain": g.uncertain,
-                "files": [asdict(f) for f in g.files],
+                "files": [{k: getattr(f, k) for k in FILE_INFO_FIELDS} for f in g.files],
             }
             for g in duplicate_groups
         ],
-        "files_by_id": {f["id"]: f for f in all_files},
+        "files_by_id": files_by_id,
+        "start_page_token": start_page_token,
+        "full_scan_at": full_scan_at,
     }
 
-    with open(scan_results_file, "w") as f:
-        json.dump(data, f, indent=2)
+    # Machine-read only: compact separators keep the C encoder on the fast path
+    with atomic_write(scan_results_file, buffering=1024 * 1024) as f:
+        f.write(json.dumps(data, separators=(",", ":")))
+
+    snapshot = {
+        "version": SCAN_SNAPSHOT_VERSION,
+        "duplicate_groups": duplicate_groups,
+        "files_by_id": data["files_by_id"],
+        "start_page_token": start_page_token,
+        "full_scan_at": full_scan_at,
+    }
+    try:
+        with atomic_write(scan_snapshot_file, "wb") as f:
+            pickle.dump(snapshot, f, protocol=5)
+    except Exception as e:
+        print(f"Warning: Failed to write scan snapshot: {e}")
+        scan_snapshot_file.unlink(missing_ok=True)
 
     print(f"Scan results saved to {scan_results_file}")
 
 
+def load_scan_snapshot() -> Optional[dict]:
+    """Load the pickle snapshot written by save_scan_results.
+
+    The snapshot is only used when it is at least as new as scan_results.json;
+    otherwise (or if it can't be unpickled, e.g. after an upgrade changed the
+    dataclasses) returns None so the caller falls back to the JSON file.
+    The file is only ever written by this app, into its own output directory.
+    """
+    paths = get_output_paths()
+    scan_results_file = paths["scan_results_file"]
+    scan_snapshot_file = paths["scan_snapshot_file"]
+
+    if not scan_snapshot_file.exists():
+        return None
+    if scan_snapshot_file.stat().st_mtime_ns < scan_results_file.stat().st_mtime_ns:
+        return None
+
+    try:
+        with open(scan_snapshot_file, "rb") as f:
+            snapshot = pickle.load(f)
+    except Exception as e:
+        print(f"Warning: Ignoring unreadable scan snapshot: {e}")
+        return None
+
+    if snapshot.get("version") != SCAN_SNAPSHOT_VERSION:
+        return None
+    return snapshot
+
+
 def load_scan_results() -> bool:
-    """Load scan results from JSON file. Returns True if loaded successfully."""
+    """Load scan results from the snapshot or JSON file. Returns True if loaded successfully."""
     scan_results_file = get_output_paths()["scan_results_file"]
 
     if not scan_results_file.exists():
         return False
 
     try:
-        with open(scan_results_file) as f:
-            data = json.load(f)
-
-        # Restore duplicate groups
-        state.duplicate_groups = []
-        for g in data.get("duplicate_groups", []):
-            files = [FileInfo(**f) for f in g["files"]]
-            state.duplicate_groups.append(DuplicateGroup(
-                md5=g["md5"],
-                files=files,
-                uncertain=g["uncertain"],
-            ))
+        data = load_scan_snapshot()
+        if data is not None:
+            state.duplicate_groups = data["duplicate_groups"]
+        else:
+            data = json.loads(scan_results_file.read_bytes())
+
+            # Restore duplicate groups, popping each raw group as it is converted
+            # so the parsed dicts and the FileInfo objects don't coexist in full
+            raw_groups = data.pop("duplicate_groups", [])
+            raw_groups.reverse()
+            state.duplicate_groups = []
+            while raw_groups:
+                g = raw_groups.pop()
+                files = [FileInfo(**f) for f in g["files"]]
+                state.duplicate_groups.append(DuplicateGroup(
+                    md5=g["md5"],
+                    files=files,
+                    uncertain=g["uncertain"],
+                ))
         state.duplicate_groups.sort(key=lambda g: g.files[0].size, reverse=True)
+        index_file_infos()
 
         # Restore files_by_id for preview downloads
         state.files_by_id = data.get("files_by_id", {})
-        state.all_files = list(state.files_by_id.values())
-        state.path_cache = {}  # Will be rebuilt as needed
+        state.path_cache = {}
+        state.start_page_token = data.get("start_page_token")
+        state.full_scan_at = data.get("full_scan_at")
 
         # Apply default filter
         state.filter_status = "pending"
@@ -262,22 +498,30 @@ def convert_to_file_info(file_dict: dict, files_by_id: dict, path_cache: dict) -
     )
 
 
-def apply_filter():
-    """Apply current filter to duplicate groups."""
-    state.filtered_indices = []
+def index_file_infos():
+    """Index the FileInfo of every duplicate group by file ID.
 
-    for i, group in enumerate(state.duplicate_groups):
-        # Status filter
-        decision = state.decisions.get(group.md5)
+    FileInfo already carries the resolved path and integer size, so lookups
+    through this index skip get_path() and the raw dict parsing.
+    """
+    state.file_infos = {f.id: f for g in state.duplicate_groups for f in g.files}
 
-        if state.filter_status == "pending" and decision is not None:
-            continue
-        elif state.filter_status == "decided" and (decision is None or decision.action == "skip"):
-            continue
-        elif state.filter_status == "skipped" and (decision is None or decision.action != "skip"):
-            continue
 
-        state.filtered_indices.append(i)
+def apply_filter():
+    """Apply current filter to duplicate groups."""
+    groups = state.duplicate_groups
+
+    # Resolve the status filter to a set of MD5s once, then do a single
+    # membership test per group
+    if state.filter_status == "pending":
+        decided = state.decisions.keys()
+        state.filtered_indices = [i for i, g in enumerate(groups) if g.md5 not in decided]
+    elif state.filter_status in ("decided", "skipped"):
+        want_skip = state.filter_status == "skipped"
+        matching = {md5 for md5, d in state.decisions.items() if (d.action == "skip") == want_skip}
+        state.filtered_indices = [i for i, g in enumerate(groups) if g.md5 in matching]
+    else:
+        state.filtered_indices = list(range(len(groups)))
 
     # Reset to first item if current is out of bounds
     if state.current_index >= len(state.filtered_indices):
@@ -302,6 +546,7 @@ def ensure_service():
         credentials_path = get_credentials_path()
         creds = authenticate(credentials_path)
         state.service = build("drive", "v3", credentials=creds)
+        state.credentials = creds
         return True
     except SystemExit:
         # authenticate() calls sys.exit on missing credentials
@@ -318,11 +563,15 @@ def ensure_service():
 
 
 def _init_session_data():
-    """Initialize session data after login (ensure dirs, load scan results, decisions)."""
+    """Initialize session data after login (ensure dirs, load decisions, scan results)."""
     ensure_dirs()
+    # Decisions first so the pending filter applied on load already sees them
+    decisions, state.decisions_intact = load_decisions()
+    set_decisions(decisions)
+    state.decisions_loaded = True
     if load_scan_results():
         print("Previous scan results loaded. You can continue reviewing duplicates.")
-    state.decisions = load_decisions()
+    compact_decisions()
 
 
 def start_login():
@@ -399,6 +648,7 @@ def check_login_complete():
 
         try:
             state.service = build("drive", "v3", credentials=creds)
+            state.credentials = creds
             user_info = get_user_info(state.service)
             state.user_email = user_info["email"]
             state.user_name = user_info["name"]
@@ -469,6 +719,7 @@ def try_auto_login():
 
     try:
         state.service = build("drive", "v3", credentials=creds)
+        state.credentials = creds
         user_info = get_user_info(state.service)
         state.user_email = user_info["email"]
         state.user_name = user_info["name"]
@@ -492,30 +743,68 @@ def try_auto_login():
         )
 
 
-def download_file(file_id: str) -> Optional[Path]:
-    """Download a file from Google Drive and cache it."""
+def preview_cache_key(file_info: FileInfo) -> str:
+    """Preview cache key for a file: its ID plus its modification time.
+
+    A file edited in Drive since it was cached gets a new key, so stale
+    previews are never shown.
+    """
+    stamp = "".join(c for c in file_info.modified_time if c.isalnum())
+    return f"{file_info.id}-{stamp}" if stamp else file_info.id
+
+
+def evict_stale_previews(file_id: str, cache_key: str):
+    """Delete cached downloads and rendered previews of older versions of a file.
+
+    Matches both the bare-ID entries written before cache keys carried the
+    modification time and any <id>-<modifiedTime> entry other than cache_key.
+    """
+    preview_cache = get_output_paths()["preview_cache"]
+    stale = re.compile(rf"{re.escape(file_id)}(-\d{{8}}T\d+Z)?(\.preview\.png)?")
+    keep = {cache_key, cache_key + ".preview.png"}
+    for path in preview_cache.glob(f"{file_id}*"):
+        if path.name not in keep and stale.fullmatch(path.name):
+            path.unlink(missing_ok=True)
+            state.preview_memo.pop(path.name, None)
+
+
+def download_file(file_id: str, service=None, cache_key: Optional[str] = None) -> Optional[Path]:
+    """Download a file from Google Drive and cache it.
+
+    Args:
+        file_id: ID of the file to download.
+        service: Drive service to use; defaults to state.service. Background
+            threads must pass their own, since the shared one isn't thread-safe.
+        cache_key: Name of the cache entry; defaults to file_id. See
+            preview_cache_key().
+    """
     from googleapiclient.errors import HttpError
 
     # Check cache first (before authentication)
-    cache_path = get_output_paths()["preview_cache"] / file_id
+    cache_path = get_output_paths()["preview_cache"] / (cache_key or file_id)
     if cache_path.exists():
         return cache_path
 
     # Ensure we're authenticated
-    if not ensure_service():
-        return None
+    if service is None:
+        if not ensure_service():
+            return None
+        service = state.service
 
+    # Stream straight into a partial file so readers never see a truncated
+    # cache entry
     try:
-        request = state.service.files().get_media(fileId=file_id)
-        fh = io.BytesIO()
-        downloader = MediaIoBaseDownload(fh, request)
+        ensure_dirs()
+        request = service.files().get_media(fileId=file_id)
+        with atomic_write(cache_path, "wb") as fh:
+            downloader = MediaIoBaseDownload(fh, request)
 
-        done = False
-        while not done:
-            _, done = downloader.next_chunk()
+            done = False
+            while not done:
+                _, done = downloader.next_chunk()
 
-        ensure_dirs()
-        cache_path.write_bytes(fh.getvalue())
+        if cache_key and cache_key != file_id:
+            evict_stale_previews(file_id, cache_key)
         return cache_path
     except HttpError as e:
         if e.resp.status == 404:
@@ -533,59 +822,176 @@ def download_file(file_id: str) -> Optional[Path]:
         return None
 
 
+def _prefetch_download(file_id: str, cache_key: str):
+    """Download a file on a prefetch worker thread using a thread-local service."""
+    service = getattr(_thread_local, "service", None)
+    if service is None:
+        service = build("drive", "v3", credentials=state.credentials)
+        _thread_local.service = service
+    download_file(file_id, service=service, cache_key=cache_key)
+
+
+def prefetch_previews():
+    """Download previews for the next few groups in the background.
+
+    By the time the user moves on, the files are already in the preview cache
+    and the next render only pays for decoding.
+    """
+    if not state.credentials:
+        return
+
+    # Forget finished downloads
+    for key in [key for key, fut in state._prefetch_futures.items() if fut.done()]:
+        del state._prefetch_futures[key]
+
+    if state._prefetch_executor is None:
+        state._prefetch_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="prefetch")
+
+    preview_cache = get_output_paths()["preview_cache"]
+    max_preview_size = get_max_preview_size()
+    start = state.current_index + 1
+    for idx in state.filtered_indices[start : start + PREFETCH_GROUPS]:
+        group = state.duplicate_groups[idx]
+        if group.md5 in state.decisions:
+            continue
+        for file_info in group.files[:2]:
+            if len(state._prefetch_futures) >= PREFETCH_MAX_IN_FLIGHT:
+                return
+            key = preview_cache_key(file_info)
+            if (
+                file_info.size > max_preview_size
+                or key in state._prefetch_futures
+                or (preview_cache / key).exists()
+            ):
+                continue
+            state._prefetch_futures[key] = state._prefetch_executor.submit(
+                _prefetch_download, file_info.id, key
+            )
+
+
 def get_preview(file_info: FileInfo) -> tuple[str, any]:
-    """Get preview for a file. Returns (type, content)."""
+    """Get preview for a file. Returns (type, content).
+
+    The last PREVIEW_MEMO_SIZE rendered previews are memoized per cache key,
+    so navigating back to a group doesn't re-read the cache file or re-run
+    pdf2image. Failures (download errors, or a handler raising PreviewError)
+    are not memoized and will be retried on the next render.
+    """
     max_preview_size = get_max_preview_size()
     if file_info.size > max_preview_size:
         return ("text", f"File too large for preview ({format_size(file_info.size)})")
 
-    mime = file_info.mime_type
+    key = preview_cache_key(file_info)
+    memoized = state.preview_memo.get(key)
+    if memoized is not None:
+        state.preview_memo.move_to_end(key)
+        return memoized
+
+    # Let an in-flight prefetch finish rather than downloading twice
+    future = state._prefetch_futures.get(key)
+    if future is not None:
+        try:
+            future.result()
+        except Exception as e:
+            print(f"Preview prefetch failed for {file_info.id}: {e}")
 
     # Download file
-    cache_path = download_file(file_info.id)
+    cache_path = download_file(file_info.id, cache_key=key)
     if not cache_path:
         return ("text", "Failed to download file for preview")
 
     try:
-        if mime.startswith("image/"):
-            return ("image", str(cache_path))
+        preview = render_preview(file_info, cache_path)
+    except PreviewError as e:
+        return ("text", str(e))
+    except Exception as e:
+        return ("text", f"Preview error: {e}")
 
-        elif mime == "application/pdf":
-            # Try to convert PDF to image
-            try:
-                from pdf2image import convert_from_path
-                preview_path = cache_path.with_suffix(".preview.png")
-                if not preview_path.exists():
-                    images = convert_from_path(str(cache_path), first_page=1, last_page=1, dpi=150)
-                    if images:
-                        images[0].save(str(preview_path), "PNG")
-                if preview_path.exists():
-                    return ("image", str(preview_path))
-                else:
-                    return ("text", "PDF preview failed - install poppler: brew install poppler")
-            except ImportError:
-                return ("text", "PDF preview requires pdf2image and poppler")
-            except Exception as e:
-                return ("text", f"PDF preview error: {e}")
+    state.preview_memo[key] = preview
+    if len(state.preview_memo) > PREVIEW_MEMO_SIZE:
+        state.preview_memo.popitem(last=False)
+    return preview
 
-        elif mime.startswith("text/") or mime in ("application/json", "application/xml", "application/javascript"):
-            content = cache_path.read_text(errors="replace")[:5000]
-            return ("code", content)
 
-        elif mime.startswith("video/"):
-            return ("video", str(cache_path))
+def _memoized_or(file_info: FileInfo, default: tuple[str, any]) -> tuple[str, any]:
+    """Return the memoized preview for a file, or default without rendering one."""
+    return state.preview_memo.get(preview_cache_key(file_info), default)
 
-        else:
-            return ("text", f"Preview not available for {mime}")
 
-    except Exception as e:
-        return ("text", f"Preview error: {e}")
+class PreviewError(Exception):
+    """A preview handler failed; the message is shown in place of the preview."""
+
+
+def _preview_image(file_info: FileInfo, cache_path: Path) -> tuple[str, any]:
+    return ("image", str(cache_path))
+
+
+def _preview_pdf(file_info: FileInfo, cache_path: Path) -> tuple[str, any]:
+    # Try to convert PDF to image
+    try:
+        from pdf2image import convert_from_path
+    except ImportError:
+        raise PreviewError("PDF preview requires pdf2image and poppler")
+
+    preview_path = cache_path.with_suffix(".preview.png")
+    if not preview_path.exists():
+        try:
+            images = convert_from_path(str(cache_path), first_page=1, last_page=1, dpi=150)
+            if images:
+                images[0].save(str(preview_path), "PNG")
+        except Exception as e:
+            raise PreviewError(f"PDF preview error: {e}")
+    if not preview_path.exists():
+        raise PreviewError("PDF preview failed - install poppler: brew install poppler")
+    return ("image", str(preview_path))
+
+
+def _preview_text(file_info: FileInfo, cache_path: Path) -> tuple[str, any]:
+    content = cache_path.read_text(errors="replace")[:5000]
+    return ("code", content)
+
+
+def _preview_video(file_info: FileInfo, cache_path: Path) -> tuple[str, any]:
+    return ("video", str(cache_path))
+
+
+PREVIEW_HANDLERS = {
+    "image": _preview_image,
+    "pdf": _preview_pdf,
+    "text": _preview_text,
+    "video": _preview_video,
+}
+
+
+def render_preview(file_info: FileInfo, cache_path: Path) -> tuple[str, any]:
+    """Render a preview from a downloaded file. Returns (type, content)."""
+    handler = PREVIEW_HANDLERS.get(file_info.preview_kind)
+    if handler is None:
+        return ("text", f"Preview not available for {file_info.mime_type}")
+    return handler(file_info, cache_path)
 
 
 # =============================================================================
 # Scan Tab Functions
 # =============================================================================
 
+def full_rescan_due() -> bool:
+    """Whether the next scan should re-list the whole drive.
+
+    The changes feed keeps files_by_id current, but anything it missed would
+    persist forever, so a full listing is forced once the last one is older
+    than the configured full_rescan_days.
+    """
+    if not state.full_scan_at:
+        return True
+    try:
+        full_scan_at = datetime.fromisoformat(state.full_scan_at.rstrip("Z"))
+    except ValueError:
+        return True
+    age = datetime.utcnow() - full_scan_at
+    return age.total_seconds() >= get_full_rescan_days() * 86400
+
+
 def run_scan(progress=gr.Progress()):
     """Run the duplicate scan."""
     from googleapiclient.errors import HttpError
@@ -597,6 +1003,7 @@ def run_scan(progress=gr.Progress()):
         credentials_path = get_credentials_path()
         creds = authenticate(credentials_path)
         state.service = build("drive", "v3", credentials=creds)
+        state.credentials = creds
     except SystemExit:
         return "Authentication failed: credentials.json not found. See terminal for setup instructions.", ""
     except FileNotFoundError:
@@ -604,32 +1011,69 @@ def run_scan(progress=gr.Progress()):
     except Exception as e:
         return f"Authentication failed: {type(e).__name__}: {e}", ""
 
-    progress(0.1, desc="Fetching files from Google Drive...")
+    incremental = False
+    if state.files_by_id and state.start_page_token and not full_rescan_due():
+        # Previous scan available: only fetch what changed since then
+        progress(0.1, desc="Fetching changes since last scan...")
+        try:
+            change_count, state.start_page_token = apply_changes(
+                state.service, state.files_by_id, state.start_page_token
+            )
+            # files_by_id was updated in place, so it already is the lookup;
+            # only the paths may have moved
+            state.path_cache = {}
+            incremental = True
+            print(f"Applied {change_count} changes since last scan")
+        except Exception as e:
+            print(f"Incremental update failed ({type(e).__name__}: {e}), doing a full fetch")
+
     try:
-        state.all_files = fetch_all_files(state.service)
+        if not incremental:
+            progress(0.1, desc="Fetching files from Google Drive...")
+            # Take the token first so changes made during the fetch aren't missed.
+            # Both are only committed to state once the listing succeeded, so a
+            # failed fetch can't pair a new token with the old files_by_id
+            start_page_token = get_start_page_token(state.service)
+            full_scan_at = datetime.utcnow().isoformat() + "Z"
+            fetched_files = fetch_all_files(state.service, credentials=state.credentials)
     except HttpError as e:
         if e.resp.status == 401:
-            return "Session expired. Delete token.json and restart.", "", ""
+            return "Session expired. Delete token.json and restart.", ""
         elif e.resp.status == 403:
-            return "Access denied. Check your Google Drive permissions.", "", ""
+            return "Access denied. Check your Google Drive permissions.", ""
         return f"Google Drive API error: {e.resp.status} - {e.error_details}", ""
     except Exception as e:
         return f"Failed to fetch files: {type(e).__name__}: {e}", ""
 
-    progress(0.5, desc="Building path index...")
-    state.files_by_id, state.path_cache = build_lookups(state.all_files)
+    if not incremental:
+        progress(0.5, desc="Building path index...")
+        state.files_by_id, state.path_cache = build_lookups(fetched_files)
+        state.start_page_token = start_page_token
+        state.full_scan_at = full_scan_at
+        # files_by_id is the only copy kept; drop the list before grouping
+        fetched_files = None
 
-    files_to_scan = state.all_files
+    # A view, not a copy: the scan only iterates over it
+    files_to_scan = state.files_by_id.values()
 
     # Apply exclude paths from config file and env var
     exclude_paths = get_exclude_paths()
     if exclude_paths:
         progress(0.65, desc=f"Applying {len(exclude_paths)} exclude path(s)...")
+        # Every file's path is needed here, so resolve them all in one pass
+        state.path_cache = build_all_paths(state.files_by_id)
         files_to_scan = filter_excluded_paths(files_to_scan, exclude_paths, state.files_by_id, state.path_cache)
 
     progress(0.7, desc="Finding duplicates...")
     raw_duplicates, skipped = find_duplicates(files_to_scan)
 
+    # Resolve all duplicate paths up front so conversion is pure cache hits
+    resolve_paths(
+        (f["id"] for dup in raw_duplicates for f in dup["files"]),
+        state.files_by_id,
+        state.path_cache,
+    )
+
     # Convert to DuplicateGroup objects
     state.duplicate_groups = []
     for dup in raw_duplicates:
@@ -640,9 +1084,16 @@ def run_scan(progress=gr.Progress()):
             uncertain=dup["uncertain"],
         ))
     state.duplicate_groups.sort(key=lambda g: g.files[0].size, reverse=True)
+    index_file_infos()
 
-    progress(0.9, desc="Loading existing decisions...")
-    state.decisions = load_decisions()
+    # Decisions loaded at session start stay authoritative in memory (every
+    # change is also appended to the log), so only parse them if not loaded yet
+    if not state.decisions_loaded:
+        progress(0.9, desc="Loading existing decisions...")
+        decisions, state.decisions_intact = load_decisions()
+        set_decisions(decisions)
+        state.decisions_loaded = True
+    compact_decisions()
 
     # Apply filter
     state.filter_status = "pending"
@@ -650,7 +1101,12 @@ def run_scan(progress=gr.Progress()):
 
     # Save scan results for reuse
     progress(0.95, desc="Saving scan results...")
-    save_scan_results(state.duplicate_groups, state.all_files)
+    save_scan_results(
+        state.duplicate_groups,
+        state.files_by_id,
+        start_page_token=state.start_page_token,
+        full_scan_at=state.full_scan_at,
+    )
 
     progress(1.0, desc="Done!")
 
@@ -696,6 +1152,15 @@ def show_review_after_scan():
     return (gr.update(visible=True),) + update_review_display()
 
 
+def scan_and_show_review(progress=gr.Progress()):
+    """Auto-start scan and show its review in a single event handler.
+
+    Returns the scan outputs followed by the review outputs, saving the
+    extra round trip of a chained .then() step.
+    """
+    return auto_start_scan(progress) + show_review_after_scan()
+
+
 # =============================================================================
 # Review Tab Functions
 # =============================================================================
@@ -714,7 +1179,7 @@ def format_file_metadata(file_info: FileInfo) -> str:
 
 **ID:** `{file_info.id[:20]}...`
 
-**[Open in Drive](https://drive.google.com/file/d/{file_info.id}/view)**
+**[Open in Drive]({file_info.drive_link})**
 """
 
 
@@ -738,8 +1203,13 @@ def format_preview_outputs(preview_type: str, preview_content: str):
         )
 
 
-def update_review_display():
-    """Update the review display with current group."""
+def update_review_display(load_previews: bool = False):
+    """Update the review display with current group.
+
+    Groups that already have a decision don't trigger preview downloads;
+    they show previews only if already memoized, unless load_previews is set
+    (the "Load Previews" button).
+    """
     group = get_current_group()
 
     if not group:
@@ -761,8 +1231,7 @@ def update_review_display():
         if decision.action == "skip":
             decision_text = " [SKIPPED]"
         else:
-            kept_id = decision.keep_file_id
-            kept_file = next((f for f in group.files if f.id == kept_id), None)
+            kept_file = group.file_index.get(decision.keep_file_id)
             if kept_file:
                 decision_text = f" [KEEPING: {kept_file.name}]"
 
@@ -780,8 +1249,13 @@ def update_review_display():
     file_a, file_b = group.files[0], group.files[1]
 
     # Get previews
-    preview_a_type, preview_a_content = get_preview(file_a)
-    preview_b_type, preview_b_content = get_preview(file_b)
+    if decision and not load_previews:
+        placeholder = ("text", "Already decided. Click Load Previews to show previews.")
+        preview_a_type, preview_a_content = _memoized_or(file_a, placeholder)
+        preview_b_type, preview_b_content = _memoized_or(file_b, placeholder)
+    else:
+        preview_a_type, preview_a_content = get_preview(file_a)
+        preview_b_type, preview_b_content = get_preview(file_b)
 
     # Format preview outputs (image and code for each side)
     preview_img_a, preview_code_a = format_preview_outputs(preview_a_type, preview_a_content)
@@ -790,6 +1264,8 @@ def update_review_display():
     meta_a = format_file_metadata(file_a)
     meta_b = format_file_metadata(file_b)
 
+    prefetch_previews()
+
     return (
         header,
         file_a.path, file_b.path,  # paths
@@ -842,7 +1318,8 @@ def make_decision(action: str, keep_file_id: str = None):
         )
 
     state.decisions[group.md5] = decision
-    save_decisions(state.decisions)
+    state.decisions_serialized[group.md5] = asdict(decision)
+    append_decision(state.decisions_serialized[group.md5])
 
     # Auto-advance to next
     if state.current_index < len(state.filtered_indices) - 1:
@@ -865,18 +1342,23 @@ def get_export_summary():
         return "No scan data. Run a scan first.", "", []
 
     decided = [d for d in state.decisions.values() if d.action != "skip"]
-    skipped = [d for d in state.decisions.values() if d.action == "skip"]
+    skipped_count = len(state.decisions) - len(decided)
 
-    # Calculate space to recover
-    total_delete_size = 0
     delete_files = []
 
     for decision in decided:
         for file_id in decision.delete_file_ids:
-            if file_id in state.files_by_id:
+            file_info = state.file_infos.get(file_id)
+            if file_info is not None:
+                delete_files.append({
+                    "id": file_id,
+                    "name": file_info.name,
+                    "path": file_info.path,
+                    "size": file_info.size,
+                })
+            elif file_id in state.files_by_id:
                 file = state.files_by_id[file_id]
                 size = int(file.get("size", 0))
-                total_delete_size += size
                 path = get_path(file_id, state.files_by_id, state.path_cache)
                 delete_files.append({
                     "id": file_id,
@@ -885,10 +1367,13 @@ def get_export_summary():
                     "size": size,
                 })
 
+    # Calculate space to recover: sizes are already ints, so one builtin sum
+    total_delete_size = sum(f["size"] for f in delete_files)
+
     summary = f"""### Decision Summary
 
 - **Groups with decisions:** {len(decided):,}
-- **Groups skipped:** {len(skipped):,}
+- **Groups skipped:** {skipped_count:,}
 - **Groups pending:** {len(state.duplicate_groups) - len(state.decisions):,}
 - **Files to move:** {len(delete_files):,}
 - **Space to recover:** {format_size(total_delete_size)}
@@ -1327,6 +1812,7 @@ def create_ui():
                 # Review section
                 with gr.Row():
                     prev_btn = gr.Button("< Previous", scale=1)
+                    load_previews_btn = gr.Button("Load Previews", scale=1)
                     next_btn = gr.Button("Next >", scale=1)
 
                 group_header = gr.Markdown("Run a scan to see duplicates.")
@@ -1369,6 +1855,11 @@ def create_ui():
                     outputs=review_outputs,
                 )
 
+                load_previews_btn.click(
+                    fn=lambda: update_review_display(load_previews=True),
+                    outputs=review_outputs,
+                )
+
                 keep_left_btn.click(
                     fn=on_keep_left,
                     outputs=review_outputs,
@@ -1405,17 +1896,17 @@ def create_ui():
                     )
 
                     def execute_with_confirmation(confirmed: bool):
+                        # Also untick the confirmation box, in the same round trip
+                        reset_checkbox = gr.update(value=False)
                         if not confirmed:
-                            return "Please check the confirmation box before executing.", []
-                        return execute_moves(dry_run=False)
+                            message = "Please check the confirmation box before executing."
+                            return message, [], reset_checkbox
+                        return (*execute_moves(dry_run=False), reset_checkbox)
 
                     execute_btn.click(
                         fn=execute_with_confirmation,
                         inputs=[confirm_checkbox],
-                        outputs=[execution_status, execution_results],
-                    ).then(
-                        fn=lambda: gr.update(value=False),
-                        outputs=[confirm_checkbox],
+                        outputs=[execution_status, execution_results, confirm_checkbox],
                     )
 
         # --- Login Event Wiring ---
@@ -1428,11 +1919,8 @@ def create_ui():
             fn=check_login_complete,
             outputs=[login_status, login_btn, login_timer, login_section, main_section, user_info_display],
         ).then(
-            fn=auto_start_scan,
-            outputs=[scan_status, scan_summary],
-        ).then(
-            fn=show_review_after_scan,
-            outputs=[review_section] + review_outputs,
+            fn=scan_and_show_review,
+            outputs=[scan_status, scan_summary, review_section] + review_outputs,
         )
 
         # Auto-login on app load (triggers auto-scan if already logged in)
@@ -1440,11 +1928,8 @@ def create_ui():
             fn=try_auto_login,
             outputs=[login_section, main_section, login_status, user_info_display],
         ).then(
-            fn=auto_start_scan,
-            outputs=[scan_status, scan_summary],
-        ).then(
-            fn=show_review_after_scan,
-            outputs=[review_section] + review_outputs,
+            fn=scan_and_show_review,
+            outputs=[scan_status, scan_summary, review_section] + review_outputs,
         )
 
     return app
@@ -0,0 +1,30 @@
+"""Tests for the partitioned fetch in fetch_all_files."""
+
+import time
+
+import pytest
+
+from dedrive import drive
+
+
+def test_partition_failure_stops_other_partitions(monkeypatch):
+    pages = {}
+
+    def fake_fetch_with_retry(service, http=None, **kwargs):
+        query = kwargs["q"]
+        pages[query] = pages.get(query, 0) + 1
+        if "and (mimeType contains 'image/')" in query:
+            raise RuntimeError("boom")
+        # Every other partition has many more pages to go
+        time.sleep(0.05)
+        return {"files": [{"id": "x"}], "nextPageToken": "next" if pages[query] < 20 else None}
+
+    monkeypatch.setattr(drive, "fetch_with_retry", fake_fetch_with_retry)
+    monkeypatch.setattr(drive, "AuthorizedHttp", lambda *args, **kwargs: None)
+    monkeypatch.setattr(drive, "build_http", lambda: None)
+
+    with pytest.raises(RuntimeError, match="boom"):
+        drive.fetch_all_files(object(), credentials=object())
+
+    assert len(pages) == len(drive.FETCH_PARTITIONS)
+    assert max(pages.values()) <= 2
@@ -0,0 +1,82 @@
+"""Tests for run_scan's handling of the Drive changes token."""
+
+import pytest
+
+from dedrive import ui
+
+OLD_TOKEN = "T1"
+OLD_SCAN_AT = "2020-01-01T00:00:00Z"
+
+
+def _file(file_id, md5="m1"):
+    return {
+        "id": file_id,
+        "name": file_id,
+        "md5Checksum": md5,
+        "size": "10",
+        "mimeType": "text/plain",
+    }
+
+
+@pytest.fixture
+def scan_env(tmp_path, monkeypatch):
+    """Previous scan in state, with Drive and auth calls stubbed out."""
+    monkeypatch.setattr(ui, "state", ui.AppState())
+    monkeypatch.setattr(ui, "get_output_dir", lambda: tmp_path)
+    monkeypatch.setattr(ui, "get_exclude_paths", lambda: [])
+    monkeypatch.setattr(ui, "authenticate", lambda path: object())
+    monkeypatch.setattr(ui, "build", lambda *args, **kwargs: object())
+    monkeypatch.setattr(ui, "get_start_page_token", lambda service: "T2")
+
+    old_files = {"a": _file("a")}
+    ui.state.files_by_id = old_files
+    ui.state.start_page_token = OLD_TOKEN
+    ui.state.full_scan_at = OLD_SCAN_AT
+    return old_files
+
+
+def _fail(*args, **kwargs):
+    raise RuntimeError("boom")
+
+
+def _run_scan():
+    return ui.run_scan(progress=lambda *args, **kwargs: None)
+
+
+def test_failed_full_fetch_keeps_previous_token(scan_env, monkeypatch):
+    # OLD_SCAN_AT is long past full_rescan_days, so this is a forced full rescan
+    monkeypatch.setattr(ui, "fetch_all_files", _fail)
+
+    status, _ = _run_scan()
+
+    assert status.startswith("Failed to fetch files")
+    assert ui.state.files_by_id is scan_env
+    assert ui.state.start_page_token == OLD_TOKEN
+    assert ui.state.full_scan_at == OLD_SCAN_AT
+    assert ui.full_rescan_due()
+
+
+def test_failed_fallback_fetch_keeps_previous_token(scan_env, monkeypatch):
+    ui.state.full_scan_at = ui.datetime.utcnow().isoformat() + "Z"
+    recent_scan_at = ui.state.full_scan_at
+    monkeypatch.setattr(ui, "apply_changes", _fail)
+    monkeypatch.setattr(ui, "fetch_all_files", _fail)
+
+    status, _ = _run_scan()
+
+    assert status.startswith("Failed to fetch files")
+    assert ui.state.start_page_token == OLD_TOKEN
+    assert ui.state.full_scan_at == recent_scan_at
+
+
+def test_successful_full_fetch_updates_token(scan_env, monkeypatch):
+    monkeypatch.setattr(
+        ui, "fetch_all_files", lambda service, credentials=None: [_file("a"), _file("b")]
+    )
+
+    status, _ = _run_scan()
+
+    assert status.startswith("Scan complete")
+    assert ui.state.start_page_token == "T2"
+    assert not ui.full_rescan_due()
+    assert len(ui.state.duplicate_groups) == 1